@@ -7,7 +7,6 @@ This software may be modified and distributed under the terms of the
 MIT license. See the LICENSE file for details.
 """
 
-import os
 import sys
 import argparse
 
@@ -25,17 +24,17 @@ def main():
         description='Create a remotestate backend to hold infra state configration'
     )
 
-    argument_parser.add_argument('--git', action='store', nargs=1, required=True,
+    argument_parser.add_argument('--git', action='store', required=True,
                                  help='GIT is the name of a local repository directory')
-    argument_parser.add_argument('--provider', action='store', nargs=1, required=False,
-                                 default=['auto'],
+    argument_parser.add_argument('--provider', action='store', required=False,
+                                 default='auto',
                                  help='PROVIDER used to create the remotestate. \
                                        Defaults to "auto"')
 
     args = argument_parser.parse_args(sys.argv[1:])
 
-    git_directory = args.git[0]
-    backend_provider = args.provider[0]
+    git_directory = args.git
+    backend_provider = args.provider
 
     if backend_provider == "auto":
         # discover based on project configuration
@@ -43,12 +42,9 @@ def main():
         backend_provider = None
 
         # check terraform first
-        terraform_provider_file = git_directory + '/terraform/provider.tf'
-        if os.path.isfile(terraform_provider_file) is True:
-            backend_provider = terraform_provider(terraform_provider_file)
-        else:
-            # no other auto configurations to check yet
-            pass
+        # terraform_provider returns None if file is not found
+        backend_provider = terraform_provider(git_directory + '/terraform/provider.tf')
+        # no other auto configurations to check yet
         if backend_provider is None:
             print('Cant retrieve backend provider automatically')
             sys.exit(1)
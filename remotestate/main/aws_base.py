@@ -5,8 +5,9 @@ Author(s): Anthony Potappel
 This software may be modified and distributed under the terms of the
 MIT license. See the LICENSE file for details.
 """
-# pylint: disable=E0401
-import boto3
+import os
+import hashlib
+import functools
 
 # pylint: disable=E0402
 from .exceptions import ResponseError
@@ -16,13 +17,67 @@ from .exceptions import ResponseError
 #    def __init__(self):
 #        self.region_name = None
 
+
+@functools.lru_cache(maxsize=None)
+def _session():
+    """Return boto3 Session, resolved once per process. Resolves profile and region
+    the same way as the default session used by boto3.client()/ boto3.resource()"""
+    # pylint: disable=E0401,C0415
+    import boto3
+    return boto3.session.Session()
+
+
 def get_region_name():
     """Return name of the current region"""
-    #if not isinstance(self.region_name, str):
-    session = boto3.session.Session()
-    return session.region_name
-    #self.region_name = session.region_name
-    #return self.region_name
+    return _session().region_name
+
+
+@functools.lru_cache(maxsize=None)
+def get_identity_key():
+    """Return a key that identifies the current AWS configuration, used to keep
+    local caches apart per account. Based on the profile name, and on the access
+    key id if credentials are set by environment (these take precedence over the
+    profile). Credentials are not resolved, so this never calls AWS."""
+    identity_key = str(_session().profile_name)
+    access_key = os.environ.get('AWS_ACCESS_KEY_ID')
+    if access_key:
+        # only store a hash of the key id
+        identity_key += ':' + hashlib.sha256(access_key.encode()).hexdigest()[0:16]
+    return identity_key
+
+
+@functools.lru_cache(maxsize=None)
+def _config():
+    """Return botocore Config shared by all clients: keep connections alive.
+    boto3/ botocore are imported on first use, which keeps startup fast for
+    code paths that do not talk to AWS."""
+    # pylint: disable=E0401,C0415
+    from botocore.config import Config
+    return Config(tcp_keepalive=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _s3_client():
+    """Return S3 client, shared by all S3Bucket objects within this process"""
+    # pylint: disable=E0401,C0415
+    import boto3
+    return boto3.client('s3', config=_config())
+
+
+@functools.lru_cache(maxsize=None)
+def _dynamo_client():
+    """Return DynamoDB client, shared by all DynamoTable objects within this process"""
+    # pylint: disable=E0401,C0415
+    import boto3
+    return boto3.client('dynamodb', config=_config())
+
+
+@functools.lru_cache(maxsize=None)
+def _dynamo_resource():
+    """Return DynamoDB resource, shared by all DynamoTable objects within this process"""
+    # pylint: disable=E0401,C0415
+    import boto3
+    return boto3.resource('dynamodb', config=_config())
 
 
 def validate_aws(response, expect_status_code=200):
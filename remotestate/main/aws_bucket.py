@@ -9,14 +9,34 @@ MIT license. See the LICENSE file for details.
 import sys
 import re
 
-# pylint: disable=E0401
-import boto3
-
 # pylint: disable=E0402
 from .exceptions import ResponseError
 #from .aws_base import AWSBase
 from .aws_base import get_region_name
+from .aws_base import _s3_client
 from .aws_base import validate_aws
+from .localcache import cache_evict_value
+
+
+# full S3 naming standard in one pass, used as fast-path before detailed checks
+_BUCKET_RE = re.compile(r'^(?=.{3,63}\Z)[a-z0-9][-a-z0-9.]*\Z')
+_DOUBLE_SPECIAL = re.compile(r'[-.]{2}')
+_UPPER_CASE = re.compile(r'[A-Z]')
+_VALID_START = re.compile(r'^[a-z0-9]')
+_VALID_CHARS = re.compile(r'^[-a-z0-9.]*\Z')
+
+
+def _s3bucket_name_error(bucket_name):
+    """Return the reason why bucket_name does not match S3 naming standards.
+    Only called for names that failed the _BUCKET_RE fast-path."""
+    if _UPPER_CASE.search(bucket_name):
+        return 'BucketName can\'t contain upper-case characters'
+    if not _VALID_START.match(bucket_name):
+        return 'BucketName should start with a lowercase letter or number'
+    if _DOUBLE_SPECIAL.search(bucket_name):
+        return 'BucketName can\'t contain two special characters [-, .] in a row'
+    return 'BucketName contains invalid character. ' \
+           'Allowed characters: [a-z, 0-9, \'.\', \'-\']'
 
 
 def validate_s3bucket_name(bucket_name):
@@ -24,19 +44,29 @@ def validate_s3bucket_name(bucket_name):
     if not isinstance(bucket_name, str):
         ValueError('Input argument \"name\" must a string')
 
-    if bucket_name.__len__() < 3 or bucket_name.__len__() > 63:
+    if len(bucket_name) < 3 or len(bucket_name) > 63:
         return (False, 'BucketName should be of length: [3-63]')
-    if re.search(r'[A-Z]', bucket_name):
-        return (False, 'BucketName can\'t contain upper-case characters')
-    if not re.match(r'^[a-z0-9]', bucket_name):
-        return (False, 'BucketName should start with a lowercase letter or number')
-    if re.search(r'[-\.]{2}', bucket_name):
-        return (False, 'BucketName can\'t contain two special characters [-, .] in a row')
-    if not re.match(r'^[-a-z0-9\.]*$', bucket_name):
-        return (False, re.sub(' +', ' ', 'BucketName contains invalid character. \
-                Allowed characters: [a-z, 0-9, \'.\', \'-\']'))
+    if not _DOUBLE_SPECIAL.search(bucket_name) and _BUCKET_RE.match(bucket_name):
+        return (True, 'Success')
+
+    # name is invalid, find out why
+    return (False, _s3bucket_name_error(bucket_name))
 
-    return (True, 'Success')
+
+# strict policy applied by S3Bucket.tighten_policy()
+_PUBLIC_ACCESS_BLOCK = {
+    'BlockPublicAcls': True,
+    'IgnorePublicAcls': True,
+    'BlockPublicPolicy': True,
+    'RestrictPublicBuckets': True
+}
+
+
+def _tagset_has_managed_by(tag_set):
+    """Return True if tag_set contains the managed_by=terraform-init tag.
+    Stops scanning at the first match."""
+    return any(tag.get('Key') == 'managed_by' and tag.get('Value') == 'terraform-init'
+               for tag in tag_set)
 
 
 class S3Bucket():
@@ -50,7 +80,9 @@ class S3Bucket():
 
         self.region_name = get_region_name()
         self.bucket_name = bucket_name
-        self.client = boto3.client('s3')
+        self.client = _s3_client()
+        # set once create_bucket() has created the bucket, or verified it is managed by us
+        self.managed = False
 
         if auto_create is True:
             self.create_bucket() \
@@ -59,11 +91,11 @@ class S3Bucket():
 
     def __info(self, message):
         """Internal info handler. Just a simple print for now."""
-        print('I: bucket \"' + self.bucket_name + '\"->' + message)
+        print(f'I: bucket "{self.bucket_name}"->{message}')
 
     def __exit(self, message):
         """Internal error handler. Just a simple print and exit for now."""
-        sys.exit('E: bucket \"' + self.bucket_name + '\"->' + message)
+        sys.exit(f'E: bucket "{self.bucket_name}"->{message}')
 
     def bucket_exist(self):
         """Check if bucket already exists in our account."""
@@ -107,33 +139,14 @@ class S3Bucket():
             # assume we do not own this bucket
             return False
 
-        # Print out each tag
-        found = [tag for tag in tag_set
-                 if isinstance(tag.get('Key'), str) and tag['Key'] == 'managed_by' \
-                 and isinstance(tag.get('Value'), str) and tag['Value'] == 'terraform-init']
-
-        if found.__len__() == 1:
-            # found the key/value we were looking for
-            return True
-
-        # not found the key/value we were looking for, assume bucket is not managed by us
-        return False
+        return _tagset_has_managed_by(tag_set)
 
 
     def create_bucket(self):
         """Create a new S3 bucket. Return True if succesful, or bucket already exists"""
 
-        # if bucket does not exist in our account, we can't own it either
-        if self.bucket_exist() is True:
-            if self.bucket_owned() is False:
-                # print error message and exit
-                self.__exit('bucket exist in our account, but is not managed by terraform-init')
-
-            # safely return self
-            self.__info('bucket exist in our account and is also managed by terraform-init')
-            return self
-
-        # bucket does not yet exist in our account, try to create it
+        # try to create the bucket straight away, if it already exists
+        # S3 tells us who owns it. No need for a pre-check.
         try:
             response = self.client.create_bucket(
                 ACL='private',
@@ -146,18 +159,34 @@ class S3Bucket():
             validate_aws(response)
 
         except self.client.exceptions.BucketAlreadyOwnedByYou:
-            # this would be very rare to happen as we do a pre-check
-            # nonetheless, we still catch for it and return it as valid
+            # bucket exist in our account, verify if its also managed by us
+            if self.bucket_owned() is False:
+                # print error message and exit
+                self.__exit('bucket exist in our account, but is not managed by terraform-init')
+
+            # safely return self
+            self.managed = True
+            self.__info('bucket exist in our account and is also managed by terraform-init')
             return self
         except self.client.exceptions.BucketAlreadyExists:
             # this will typicall happen when a bucket is owned by someone else.
+            # drop bucket from local cache, to force a fresh lookup next time.
+            cache_evict_value(self.bucket_name)
             self.__exit('BucketAlreadyExists, not owned by us.')
         except self.client.exceptions.ClientError as exception_error:
+            # e.g. AccessDenied (no s3:CreateBucket permission) or InvalidLocationConstraint
+            # (us-east-1) are also raised for an existing bucket. Accept if its managed by us.
+            if self.bucket_owned() is True:
+                self.managed = True
+                self.__info('bucket exist in our account and is also managed by terraform-init')
+                return self
             # other invalid input error (this will handle some other cases, e.g. InvalidBucketName)
-            self.__exit('S3ResponseError when creating bucket: ' + exception_error.__str__())
+            # drop bucket from local cache, to force a fresh lookup next time.
+            cache_evict_value(self.bucket_name)
+            self.__exit('S3ResponseError when creating bucket: ' + str(exception_error))
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
-            self.__exit('ResponseError when creating bucket: ' + exception_error.__str__())
+            self.__exit('ResponseError when creating bucket: ' + str(exception_error))
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
@@ -178,40 +207,66 @@ class S3Bucket():
 
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
-            self.__exit('ResponseError when creating bucket: ' + exception_error.__str__())
+            self.__exit('ResponseError when creating bucket: ' + str(exception_error))
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
 
         # if we made it up till here, bucket has been created
+        self.managed = True
         self.__info('new bucket created')
         return self
 
 
-    def tighten_policy(self):
-        """Put a strict policy on the bucket to prevent public usage"""
-        if self.bucket_owned() is not True:
-            self.__exit('cant update policy, bucket is not managed by us.')
+    def __block_public_access(self):
+        """Block all public access to the bucket, skip if already blocked"""
+        try:
+            response = self.client.get_public_access_block(Bucket=self.bucket_name)
+            validate_aws(response)
+            if response.get('PublicAccessBlockConfiguration') == _PUBLIC_ACCESS_BLOCK:
+                # already configured, no need to write
+                return
+        except self.client.exceptions.ClientError:
+            # typically NoSuchPublicAccessBlockConfiguration, write the block below
+            pass
+        except ResponseError:
+            # can't read current configuration, write the block below
+            pass
+        except Exception as exception_error:
+            # oops, this exception is not yet covered
+            raise exception_error
 
         try:
             response = self.client.put_public_access_block(
                 Bucket=self.bucket_name,
-                PublicAccessBlockConfiguration={
-                    'BlockPublicAcls': True,
-                    'IgnorePublicAcls': True,
-                    'BlockPublicPolicy': True,
-                    'RestrictPublicBuckets': True
-                },
+                PublicAccessBlockConfiguration=_PUBLIC_ACCESS_BLOCK,
             )
             validate_aws(response)
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
-            self.__exit('ResponseError when tightening policy: ' + exception_error.__str__())
+            self.__exit('ResponseError when tightening policy: ' + str(exception_error))
+        except Exception as exception_error:
+            # oops, this exception is not yet covered
+            raise exception_error
+
+    def __enable_versioning(self):
+        """Enable version control on the bucket, skip if already enabled"""
+        try:
+            response = self.client.get_bucket_versioning(Bucket=self.bucket_name)
+            validate_aws(response)
+            if response.get('Status') == 'Enabled':
+                # already enabled, no need to write
+                return
+        except self.client.exceptions.ClientError:
+            # can't read current configuration, enable versioning below
+            pass
+        except ResponseError:
+            # can't read current configuration, enable versioning below
+            pass
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
 
-        # add version control
         try:
             response = self.client.put_bucket_versioning(
                 Bucket=self.bucket_name,
@@ -222,11 +277,22 @@ class S3Bucket():
             validate_aws(response)
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
-            self.__exit('ResponseError when enabling versioning: ' + exception_error.__str__())
+            self.__exit('ResponseError when enabling versioning: ' + str(exception_error))
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
 
+    def tighten_policy(self):
+        """Put a strict policy on the bucket to prevent public usage"""
+        # skip the check if create_bucket() already did this
+        if self.managed is not True and self.bucket_owned() is not True:
+            self.__exit('cant update policy, bucket is not managed by us.')
+
+        # run serially, S3 can reject concurrent configuration writes on the
+        # same bucket with OperationAborted (409)
+        self.__block_public_access()
+        self.__enable_versioning()
+
         # policy succesfully updated
         self.__info('strict policy enabled')
         return self
@@ -9,20 +9,34 @@ MIT license. See the LICENSE file for details.
 import sys
 import re
 import time
-# pylint: disable=E0401
-import boto3
+import concurrent.futures
 
 # pylint: disable=E0402
 from .exceptions import ResponseError
 #from .aws_base import AWSBase
 from .aws_base import get_region_name
+from .aws_base import get_identity_key
+from .aws_base import _dynamo_client
+from .aws_base import _dynamo_resource
 from .aws_base import validate_aws
 from .aws_bucket import validate_s3bucket_name
+from .localcache import cache_lookup
+from .localcache import cache_store
+
+
+# full DynamoDB naming standard in one pass, used as fast-path before detailed checks
+_TABLE_RE = re.compile(r'^(?=.{3,250}\Z)[A-Za-z0-9][-A-Za-z0-9._]*\Z')
+_TABLE_DBL = re.compile(r'[-._]{2}')
+_TABLE_START = re.compile(r'^[a-zA-Z0-9]')
+_TABLE_CHARS = re.compile(r'^[-a-zA-Z0-9._]*\Z')
+
+# nano-seconds per micro-second
+_USEC = 1000
 
 
 def time_string():
     """Return current time in micro-second (usec) as a string"""
-    return str(round(time.time()*10**6))
+    return str(time.time_ns() // _USEC)
 
 
 def validate_name_dynamotable(table_name):
@@ -30,16 +44,21 @@ def validate_name_dynamotable(table_name):
     if not isinstance(table_name, str):
         ValueError('Input argument \"name\" must a string')
 
-    if table_name.__len__() < 3 or table_name.__len__() > (255 - 5):
+    if len(table_name) < 3 or len(table_name) > (255 - 5):
         # note: deduct 5 chars to allow postfix space (e.g. for .lock)
         return (False, 'TableName should be of length: [3-255]')
-    if not re.match(r'^[a-zA-Z0-9]', table_name):
+    if not _TABLE_DBL.search(table_name) and _TABLE_RE.match(table_name):
+        # valid name, skip the detailed checks below
+        return (True, 'Success')
+
+    # name is invalid, find out why
+    if not _TABLE_START.match(table_name):
         return (False, 'BucketName should start with a lowercase letter or number')
-    if re.search(r'[-\._]{2}', table_name):
+    if _TABLE_DBL.search(table_name):
         return (False, 'TableName can\'t contain two special characters [-, ., _] in a row')
-    if not re.match(r'^[-a-zA-Z0-9\._]*$', table_name):
-        return (False, re.sub(' +', ' ', 'TableName contains invalid character. \
-                Allowed characters: [a-z, A-Z, 0-9, \'.\', \'-\', \'_\']'))
+    if not _TABLE_CHARS.match(table_name):
+        return (False, 'TableName contains invalid character. '
+                       'Allowed characters: [a-z, A-Z, 0-9, \'.\', \'-\', \'_\']')
 
     return (True, 'Success')
 
@@ -55,36 +74,28 @@ class DynamoTable():
 
         self.region_name = get_region_name()
         self.table_name = table_name
-        self.client = boto3.client('dynamodb')
-        self.resource = boto3.resource('dynamodb')
+        self.lock_table = f'{table_name}.lock'
+        self.s3_table = f'{table_name}.s3'
+        # set when create_tables() actually creates the (empty) s3 table
+        self.s3_table_created = False
+        self.client = _dynamo_client()
+        self.resource = _dynamo_resource()
 
         if auto_create is True:
             self.create_tables(check_exist=True)
 
     def __info(self, message):
         """Internal info handler. Just a simple print for now."""
-        print('I: table \"' + self.table_name + '\"->' + message)
+        print(f'I: table "{self.table_name}"->{message}')
 
     def __exit(self, message):
         """Internal error handler. Just a simple print and exit for now."""
-        sys.exit('E: table \"' + self.table_name + '\"->' + message)
+        sys.exit(f'E: table "{self.table_name}"->{message}')
 
-    def tables_exist(self):
-        """Check if table already exists in our account."""
+    def __table_exist(self, table_name):
+        """Check if a single table already exists in our account."""
         try:
-            response = self.client.describe_table(TableName=self.table_name + '.lock')
-            validate_aws(response)
-        except self.client.exceptions.ResourceNotFoundException:
-            return False
-        except ResponseError as exception_error:
-            # un-expected response
-            raise exception_error
-        except Exception as exception_error:
-            # catch other errors
-            raise exception_error
-
-        try:
-            response = self.client.describe_table(TableName=self.table_name + '.s3')
+            response = self.client.describe_table(TableName=table_name)
             validate_aws(response)
         except self.client.exceptions.ResourceNotFoundException:
             return False
@@ -97,6 +108,22 @@ class DynamoTable():
 
         return True
 
+    def __wait_table(self, table_name):
+        """Wait till table exists. Waiter is created within the calling thread,
+        because waiter objects should not be shared between threads."""
+        self.client.get_waiter('table_exists').wait(TableName=table_name)
+
+    def tables_exist(self):
+        """Check if tables already exists in our account."""
+        # describe both tables concurrently
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(self.__table_exist, table_name)
+                       for table_name in (self.lock_table, self.s3_table)]
+            # result() re-raises any exception caught within the thread
+            tables_found = [future.result() for future in futures]
+
+        return False not in tables_found
+
     def create_tables(self, check_exist=False):
         """Create new tables. Return True if succesful,
         also return True if tables already exists"""
@@ -110,7 +137,7 @@ class DynamoTable():
         try:
             # create lock table, used by Terraform to lock state
             table_lock = self.client.create_table(
-                TableName=self.table_name + '.lock',
+                TableName=self.lock_table,
                 AttributeDefinitions=[{'AttributeName': 'LockID', 'AttributeType': 'S'}],
                 KeySchema=[{'AttributeName': 'LockID', 'KeyType': 'HASH'}],
                 ProvisionedThroughput={'ReadCapacityUnits': 5,
@@ -123,7 +150,7 @@ class DynamoTable():
             pass
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
-            self.__exit('ResponseError when creating table: ' + exception_error.__str__())
+            self.__exit('ResponseError when creating table: ' + str(exception_error))
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
@@ -131,28 +158,32 @@ class DynamoTable():
         # create s3 table, used to translate url to s3 bucket names
         try:
             table_s3 = self.client.create_table(
-                TableName=self.table_name + '.s3',
+                TableName=self.s3_table,
                 AttributeDefinitions=[{'AttributeName': 'GitURI', 'AttributeType': 'S'}],
                 KeySchema=[{'AttributeName': 'GitURI', 'KeyType': 'HASH'}],
                 ProvisionedThroughput={'ReadCapacityUnits': 5,
                                        'WriteCapacityUnits': 5},
             )
             validate_aws(table_s3)
+            self.s3_table_created = True
         except self.client.exceptions.ResourceInUseException:
             # this would be very rare to happen as we do a pre-check
             # nonetheless, we still catch for it and pass on as ok
             pass
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
-            self.__exit('ResponseError when creating table: ' + exception_error.__str__())
+            self.__exit('ResponseError when creating table: ' + str(exception_error))
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
 
         # wait till both tables exist
         try:
-            self.client.get_waiter('table_exists').wait(TableName=self.table_name + '.lock')
-            self.client.get_waiter('table_exists').wait(TableName=self.table_name + '.s3')
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(self.__wait_table, table_name)
+                           for table_name in (self.lock_table, self.s3_table)]
+                for future in futures:
+                    future.result()
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
@@ -161,13 +192,27 @@ class DynamoTable():
         self.__info('new bucket created')
         return self
 
+    def __cache_key(self, bucket_uri):
+        """Return local cache key for bucket_uri. The same GitURI maps to a different
+        bucket in another account, so the key includes the profile identity."""
+        return get_identity_key() + '/' + str(self.region_name) + '/' + bucket_uri
+
     def lookup_s3(self, bucket_uri=None, auto_create=False):
         """Lookup s3 real bucket name by querying the bucket_uri
         if auto_create is True, generate a new bucket name"""
         if not isinstance(bucket_uri, str):
             ValueError('Input argument \"bucket_uri\" must a string')
 
-        table = self.resource.Table(self.table_name + '.s3')
+        # GitURI->BucketName does not change after creation, try local cache first.
+        # skip the cache if the s3 table was just created: DynamoDB is leading, and
+        # the new mapping must be written there for other users of this account.
+        cache_key = self.__cache_key(bucket_uri)
+        if self.s3_table_created is False:
+            value = cache_lookup(cache_key)
+            if value is not None:
+                return value
+
+        table = self.resource.Table(self.s3_table)
 
         try:
             response = table.get_item(
@@ -179,6 +224,7 @@ class DynamoTable():
             if not isinstance(value, str):
                 # raise KeyError also when value is not of correct format
                 raise KeyError
+            cache_store(cache_key, value)
             return value
         except KeyError:
             # expected error when item is not in database, or if format is in-correct
@@ -186,7 +232,7 @@ class DynamoTable():
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
             self.__exit('ResponseError when putting Dynamo table item: ' \
-                        + exception_error.__str__())
+                        + str(exception_error))
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
@@ -216,8 +262,10 @@ class DynamoTable():
         except ResponseError as exception_error:
             # can't read response, or we do not have the error code covered yet
             self.__exit('ResponseError when putting Dynamo table item: ' \
-                        + exception_error.__str__())
+                        + str(exception_error))
         except Exception as exception_error:
             # oops, this exception is not yet covered
             raise exception_error
+
+        cache_store(cache_key, bucket_name)
         return bucket_name
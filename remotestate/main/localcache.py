@@ -0,0 +1,92 @@
+"""
+Copyright (c) 2019 LINKIT, The Netherlands. All Rights Reserved.
+Author(s): Anthony Potappel
+
+This software may be modified and distributed under the terms of the
+MIT license. See the LICENSE file for details.
+"""
+
+import os
+import json
+import time
+import tempfile
+
+
+CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'remotestate', 's3_map.json')
+
+# entries older than this (in seconds) are ignored, and re-queried upstream
+CACHE_TTL = 24 * 60 * 60
+
+
+def _load_cache():
+    """Return cache contents as a dictionary, return empty dictionary if
+    cache does not exist or can't be read"""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, ValueError):
+        return {}
+
+    if not isinstance(cache, dict):
+        return {}
+    return cache
+
+
+def _is_fresh(entry):
+    """Return True if entry is of correct format, and not yet expired"""
+    return isinstance(entry, dict) \
+        and isinstance(entry.get('value'), str) \
+        and isinstance(entry.get('time'), (int, float)) \
+        and time.time() - entry['time'] <= CACHE_TTL
+
+
+def _save_cache(cache):
+    """Write cache to disk, dropping expired entries. Write to a temporary file
+    first, and replace the original, such that readers never see a partially
+    written file"""
+    cache = {key: entry for key, entry in cache.items() if _is_fresh(entry)}
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        file_descriptor, temporary_file = tempfile.mkstemp(dir=os.path.dirname(CACHE_FILE))
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as cache_file:
+            json.dump(cache, cache_file)
+        os.replace(temporary_file, CACHE_FILE)
+    except (IOError, OSError):
+        # cache is only an optimisation, its fine if we cant write it
+        pass
+
+
+def cache_lookup(key):
+    """Return cached value for key, or None if key is not cached or expired.
+    A key of None disables the cache, and always returns None"""
+    if key is None:
+        return None
+
+    entry = _load_cache().get(key)
+    if not _is_fresh(entry):
+        # not cached, or expired
+        return None
+    return entry['value']
+
+
+def cache_store(key, value):
+    """Store value for key in cache, a key of None is not stored"""
+    if key is None:
+        return
+
+    cache = _load_cache()
+    cache[key] = {'value': value, 'time': time.time()}
+    _save_cache(cache)
+
+
+def cache_evict_value(value):
+    """Remove all entries from cache that hold value"""
+    cache = _load_cache()
+    keys = [key for key, entry in cache.items()
+            if not isinstance(entry, dict) or entry.get('value') == value]
+    if not keys:
+        return
+
+    for key in keys:
+        del cache[key]
+    _save_cache(cache)
@@ -6,11 +6,10 @@ This software may be modified and distributed under the terms of the
 MIT license. See the LICENSE file for details.
 """
 
+import os
 import sys
 import re
-
-# pylint: disable=E0401
-from jinja2 import Template
+import functools
 
 # pylint: disable=E0402
 from . import gitconfig_rs as gitconfig
@@ -18,6 +17,48 @@ from .aws_bucket import S3Bucket
 from .aws_table import DynamoTable
 
 
+# git configuration does not change during a run, avoid re-reading .git/config
+# and re-running git for repeated calls on the same git_directory
+_remote = functools.lru_cache(maxsize=32)(gitconfig.remote_read)
+_branch = functools.lru_cache(maxsize=32)(gitconfig.current_branch)
+
+# plain {{ NAME }} placeholders can be substituted without a template engine
+_PLACEHOLDER_RE = re.compile(r'{{\s*([A-Za-z_][A-Za-z0-9_]*)\s*}}')
+
+# split git url into host and path, strip protocol, username and .git postfix.
+# works for both "https://[user@]host/path" and "[user@]host:path" type of urls.
+_GIT_URL_RE = re.compile(r'^(?:[^@]+@|\w+://(?:[^@]+@)?)?'
+                         r'(?P<host>[^:/]+)[:/](?P<path>.+?)(?:\.git)?$')
+
+
+@functools.lru_cache(maxsize=8)
+def _read_template(template_file):
+    """Return (stripped) contents of template_file, read once per process"""
+    with open(template_file, 'r') as infile:
+        return infile.read().strip()
+
+
+@functools.lru_cache(maxsize=8)
+def _jinja_template(template_data):
+    """Return compiled Jinja2 Template, compiled once per template"""
+    # pylint: disable=E0401,C0415
+    from jinja2 import Template
+    return Template(template_data)
+
+
+def render_template(template_data, mapping):
+    """Render template_data with values from mapping. Templates that only use
+    plain {{ NAME }} placeholders are substituted directly, anything else
+    (e.g. statements, comments or filters) is passed on to Jinja2."""
+    if '{%' not in template_data and '{#' not in template_data \
+    and template_data.count('{{') == len(_PLACEHOLDER_RE.findall(template_data)):
+        # undefined variables render as empty string, equal to Jinja2 default
+        return _PLACEHOLDER_RE.sub(lambda match: str(mapping.get(match.group(1), '')),
+                                   template_data)
+
+    return _jinja_template(template_data).render(**mapping)
+
+
 class Backend():
     """Parent function for Backend handlers"""
     def __init__(self,
@@ -38,15 +79,14 @@ class Backend():
     def update_backend_terraform(self):
         """Write a new terraform backend file, by reading template file and update this
         with retrieved variables from backend_provider and current git project"""
-        with open(self.backend_template_file, 'r') as template_file:
-            template_data = template_file.read().strip()
-
-        template = Template(template_data)
-        rendered = template.render(BUCKET_NAME=self.keyvalue_map.get('bucket_name'),
-                                   TABLE_LOCK=self.table_name + '.lock',
-                                   REPO_NAME=self.keyvalue_map.get('repo_name'),
-                                   BRANCH_NAME=self.keyvalue_map.get('branch_name'),
-                                   REGION_NAME=self.region_name)
+        # template is read from disk only once per process
+        template_data = _read_template(os.path.abspath(self.backend_template_file))
+        rendered = render_template(template_data,
+                                   {'BUCKET_NAME': self.keyvalue_map.get('bucket_name'),
+                                    'TABLE_LOCK': self.table_name + '.lock',
+                                    'REPO_NAME': self.keyvalue_map.get('repo_name'),
+                                    'BRANCH_NAME': self.keyvalue_map.get('branch_name'),
+                                    'REGION_NAME': self.region_name})
 
         # create backend directory (e.g. ./build) if not yet exist
         #if not os.path.isdir(os.path.dirname(self.backend_output_file)):
@@ -67,32 +107,30 @@ class Backend():
         """
 
         # retrieve full url from the GIT repository
-        git_url_project = gitconfig.remote_read(git_directory=self.git_directory,
-                                                name='origin')
+        git_url_project = _remote(git_directory=self.git_directory, name='origin')
         if not isinstance(git_url_project, dict) \
         or not isinstance(git_url_project.get('origin'), str):
-            raise ValueError(re.sub(' +', ' ', 'giturl not found, location searched: \
-                             .git/config -> [remote \"origin\"] -> url'))
+            raise ValueError('giturl not found, location searched: '
+                             '.git/config -> [remote \"origin\"] -> url')
         git_url_project = git_url_project['origin'].lower()
 
-        # strip protocol and/ or username addon
-        host_path = re.sub(r'.*:\/\/|.*@', '', '/'.join(git_url_project.split('/')[0:-1]))
-        # for ssh the path is split by a ':', replace by '/'
-        host_path = re.sub(r':', '/', host_path)
-
-        git_host = host_path.split('/')[0]
+        # parse host and path in one pass
+        match = _GIT_URL_RE.match(git_url_project)
+        if not match:
+            raise ValueError('giturl not of correct format')
 
-        git_path = '.'.join(host_path.split('/')[1:])
+        git_host = match.group('host')
+        path_parts = match.group('path').split('/')
+        git_path = '.'.join(path_parts[0:-1])
 
-        self.keyvalue_map['repo_name'] = re.sub(r'\.git$', '', git_url_project.split('/')[-1])
+        self.keyvalue_map['repo_name'] = path_parts[-1]
         self.keyvalue_map['bucket_uri'] = git_host + '/' + git_path + '/' \
                                           + self.keyvalue_map['repo_name']
-        self.keyvalue_map['branch_name'] = gitconfig.current_branch(self.git_directory)
+        self.keyvalue_map['branch_name'] = _branch(self.git_directory)
         if not isinstance(self.keyvalue_map['branch_name'], str):
             raise ValueError('gitbranch not of correct format')
 
-        self.table_name = 'terraform.' + \
-                          '.'.join(self.keyvalue_map['bucket_uri'].split('/')[0:-1])
+        self.table_name = 'terraform.' + git_host + '.' + git_path
 
 
 class BackendAWS(Backend):
@@ -109,7 +147,7 @@ class BackendAWS(Backend):
             self.table = DynamoTable(table_name=self.table_name,
                                      auto_create=True)
         except ValueError as error:
-            print(error.__str__())
+            print(str(error))
             sys.exit(1)
         except Exception as error:
             raise error
@@ -128,7 +166,7 @@ class BackendAWS(Backend):
                 self.table.lookup_s3(bucket_uri=self.keyvalue_map['bucket_uri'],
                                      auto_create=True)
         except ValueError as error:
-            print(error.__str__())
+            print(str(error))
             sys.exit(1)
         except Exception as error:
             raise error
@@ -144,7 +182,7 @@ class BackendAWS(Backend):
             self.bucket = S3Bucket(bucket_name=self.keyvalue_map['bucket_name'],
                                    auto_create=True)
         except ValueError as error:
-            print(error.__str__())
+            print(str(error))
             sys.exit(1)
         except Exception as error:
             raise error
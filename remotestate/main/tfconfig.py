@@ -6,39 +6,43 @@ This software may be modified and distributed under the terms of the
 MIT license. See the LICENSE file for details.
 """
 
-import os
 import re
 import warnings
 
 
+# matches 'provider "${provider_name}" {', whitespace may include newlines
+_PROVIDER_RE = re.compile(rb'provider\s+["\']([-a-zA-Z0-9]*)["\']\s*{')
+
+
 def terraform_provider(provider_file):
     """Parse provider_file (e.g. provider.tf) file to get provider"""
-    if not os.path.isfile(provider_file):
-        warnings.warn('cant access provider_file:' + provider_file)
-        return None
-
     try:
-        with open(provider_file, 'r') as infile:
+        # read as bytes, provider name is ascii so no need to decode the whole file
+        with open(provider_file, 'rb') as infile:
             data = infile.read()
+    except FileNotFoundError:
+        # no provider_file is a valid case for auto-detection, fail silently.
+        # no need for a separate os.path.isfile check
+        return None
     except IOError:
+        # e.g. unreadable or directory path
         warnings.warn('cant access provider_file:' + provider_file)
         return None
     except Exception as exception:
         # unknown error
         raise exception
 
-    # remove newlines for easy regex
-    contents = ' '.join(data.strip().split('\n'))
+    # cheap substring check before starting the regex engine
+    index = data.find(b'provider')
+    if index < 0:
+        return None
 
-    # remove double spaces and check if we can find 'provider "${provider_name} {'
-    match = re.search(' ?provider ["\'][-a-zA-Z0-9]*["\'] ?{', re.sub(' +', ' ', contents))
+    match = _PROVIDER_RE.search(data, index)
     if not match:
         return None
 
-    # strip out provider name
-    match = re.sub('.*provider |[ "\'{]*', '', match.group())
-
     # check if its a reasonable length
-    if 32 > match.__len__() > 1:
-        return match
+    provider_name = match.group(1).decode('ascii')
+    if 32 > len(provider_name) > 1:
+        return provider_name
     return None
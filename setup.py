@@ -13,12 +13,10 @@ setuptools.setup(
     description="Creating or updating remotestate for infra deployments",
     url="https://github.com/LINKIT-Group/remotestate",
     packages=setuptools.find_packages(),
-    #python_requires='~=3.5, ~=3.6, ~=3.7',
+    python_requires='>=3.7',
     classifiers=[
         "Operating System :: POSIX :: Linux",
         "License :: OSI Approved :: MIT License",
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
     ],
 )